@@ -0,0 +1,64 @@
+"""Throughput of /api/process-pdf/batch for 1, 10 and 100 document batches.
+
+Run from python-backend/:  python benchmarks/bench_batch.py [--pages N]
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+from fixtures import make_report_pdf, run_backend, serve_pdfs
+
+BATCH_SIZES = [1, 10, 100]
+
+
+def run_batch(base_url: str, urls) -> dict:
+    started = time.perf_counter()
+    first = None
+    failures = 0
+    with httpx.stream(
+        "POST", base_url + "/api/process-pdf/batch", json={"file_urls": urls}, timeout=None
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            if first is None:
+                first = time.perf_counter() - started
+            if not json.loads(line)["ok"]:
+                failures += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": len(urls),
+        "seconds": round(elapsed, 3),
+        "first_result_seconds": round(first or 0.0, 3),
+        "docs_per_second": round(len(urls) / elapsed, 2),
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--images", action="store_true")
+    args = parser.parse_args()
+
+    # Every document gets distinct content so the extraction cache never hits
+    files = {
+        f"/report-{i}.pdf": make_report_pdf(args.pages, args.images, seed=i)
+        for i in range(max(BATCH_SIZES) * 2)
+    }
+    paths = list(files)
+
+    with serve_pdfs(files) as files_url, run_backend() as backend:
+        offset = 0
+        for size in BATCH_SIZES:
+            urls = [files_url + path for path in paths[offset:offset + size]]
+            offset += size
+            print(json.dumps(run_batch(backend.base_url, urls)))
+
+
+if __name__ == "__main__":
+    main()
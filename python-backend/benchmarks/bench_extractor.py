@@ -0,0 +1,50 @@
+"""Per-document cost of extract_measurements against the original regex scans.
+
+The original scans only know the generic layout; for the vendor layouts
+they show what the same passes over the text cost.
+
+Run from python-backend/:  python benchmarks/bench_extractor.py [--documents N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import extract_measurements  # noqa: E402
+from models import RoofMeasurements  # noqa: E402
+from fixtures import FILLER, REPORT_FORMATS, legacy_extract_measurements, report_text  # noqa: E402
+
+
+def corpus(documents: int, pages: int, vendor: str):
+    # Summary up front followed by boilerplate pages, like a real report
+    return [report_text(seed, vendor) + (FILLER * 20 + "\n") * pages for seed in range(documents)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for vendor, pages in [(vendor, pages) for vendor in REPORT_FORMATS for pages in (1, 10, 40)]:
+        texts = corpus(args.documents, pages, vendor)
+        # The original endpoint also built the response model from the scan
+        legacy = min(timeit.repeat(
+            lambda: [RoofMeasurements(**legacy_extract_measurements(t), suggested_waste_percentage=10.0) for t in texts],
+            number=1, repeat=args.repeat,
+        ))
+        current = min(timeit.repeat(
+            lambda: [extract_measurements(t) for t in texts], number=1, repeat=args.repeat
+        ))
+        print(
+            f"{vendor:<16} {pages:>3} pages: legacy {legacy / len(texts) * 1e6:8.1f} us/doc, "
+            f"current {current / len(texts) * 1e6:8.1f} us/doc, "
+            f"speedup {legacy / current:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
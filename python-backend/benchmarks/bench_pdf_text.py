@@ -0,0 +1,76 @@
+"""Latency and peak Python memory of page-targeted vs whole-document text extraction.
+
+Covers every vendor layout with the summary on the first page, and the
+generic layout with the summary on the last page, found either through
+the PDF outline or by reading page after page.
+
+Run from python-backend/:  python benchmarks/bench_pdf_text.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # noqa: E402
+
+from extraction import extract_measurements  # noqa: E402
+from fixtures import make_report_pdf  # noqa: E402
+from pdf_text import extract_pdf_measurements  # noqa: E402
+
+
+def legacy_measurements(pdf_data: bytes):
+    # Every page extracted and concatenated, then scanned as one string
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    doc.close()
+    return extract_measurements(text)
+
+
+def measure(fn, source, repeat: int = 5):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(source)
+    elapsed = (time.perf_counter() - started) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+# (label, vendor, summary on the last page, outline pointing at it)
+SCENARIOS = [
+    ("generic", "generic", False, False),
+    ("eagleview", "eagleview", False, False),
+    ("hover", "hover", False, False),
+    ("gaf_quickmeasure", "gaf_quickmeasure", False, False),
+    ("summary-last+outline", "generic", True, True),
+    ("summary-last", "generic", True, False),
+]
+
+
+def main():
+    for label, vendor, last, outline in SCENARIOS:
+        for pages in (1, 10, 30, 60):
+            summary_page = pages - 1 if last else 0
+            pdf_data = make_report_pdf(pages, vendor=vendor, summary_page=summary_page, outline=outline)
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as handle:
+                handle.write(pdf_data)
+                handle.flush()
+                legacy_time, legacy_peak = measure(legacy_measurements, pdf_data)
+                lazy_time, lazy_peak = measure(extract_pdf_measurements, handle.name)
+                _, _, read = extract_pdf_measurements(handle.name)
+            print(
+                f"{label:<21} {pages:>3} pages: whole-document {legacy_time * 1e3:7.2f} ms {legacy_peak / 1024:6.0f} KiB, "
+                f"page-targeted {lazy_time * 1e3:7.2f} ms {lazy_peak / 1024:6.0f} KiB, "
+                f"{read['pages_read']:>2} pages read"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Peak RSS of the backend while it receives N concurrent ~20 MB uploads.
+
+Run from python-backend/:  python benchmarks/bench_upload_rss.py [--concurrency N]
+
+Peak RSS is read from VmHWM in /proc, so this needs Linux. It is reported
+for the server process and for the largest PDF worker process.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+from fixtures import child_pids, make_report_pdf, peak_rss_kib, run_backend
+
+
+async def upload_all(base_url: str, pdf_data: bytes, concurrency: int, mode: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async def upload():
+            # A unique trailer after %%EOF defeats the extraction cache
+            body = pdf_data + f"\n%{uuid.uuid4()}\n".encode()
+            if mode == "multipart":
+                response = await client.post(
+                    "/api/process-pdf/upload", files={"file": ("report.pdf", body, "application/pdf")}
+                )
+            else:
+                response = await client.post(
+                    "/api/process-pdf/upload", content=body, headers={"Content-Type": "application/pdf"}
+                )
+            return response.status_code
+
+        return await asyncio.gather(*(upload() for _ in range(concurrency)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=28, help="~0.7 MB of imagery per page")
+    parser.add_argument("--mode", choices=["raw", "multipart"], default="raw")
+    args = parser.parse_args()
+
+    pdf_data = make_report_pdf(args.pages, images=True)
+    with run_backend({"PDF_MAX_PENDING": str(args.concurrency * 2)}) as backend:
+        baseline = peak_rss_kib(backend.pid)
+        started = time.perf_counter()
+        statuses = asyncio.run(upload_all(backend.base_url, pdf_data, args.concurrency, args.mode))
+        elapsed = time.perf_counter() - started
+        workers = [peak_rss_kib(pid) for pid in child_pids(backend.pid)]
+        print(json.dumps({
+            "mode": args.mode,
+            "concurrency": args.concurrency,
+            "upload_mib": round(len(pdf_data) / 2**20, 1),
+            "seconds": round(elapsed, 2),
+            "statuses": sorted(set(statuses)),
+            "server_peak_rss_mib_before": round(baseline / 1024, 1),
+            "server_peak_rss_mib": round(peak_rss_kib(backend.pid) / 1024, 1),
+            "worker_peak_rss_mib": round(max(workers, default=0) / 1024, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
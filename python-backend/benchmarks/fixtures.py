@@ -0,0 +1,325 @@
+"""Synthetic measurement reports and local servers shared by the benchmarks."""
+
+import contextlib
+import hashlib
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PITCHES = ["4/12", "5/12", "6/12", "7/12", "8/12", "9/12", "10/12"]
+
+FILLER = (
+    "This report is provided for the exclusive use of the recipient. Measurements "
+    "are derived from aerial imagery and are subject to the terms and conditions "
+    "of the provider. Accuracy may vary with tree cover and image quality. "
+)
+
+
+def report_values(seed: int = 0) -> dict:
+    """Random but self-consistent measurements, as extract_measurements returns them."""
+    rng = random.Random(seed)
+    pitches = rng.sample(PITCHES, rng.randint(1, 4))
+    pitch_areas = [round(rng.uniform(200, 1500), 1) for _ in pitches]
+    total_area = round(sum(pitch_areas), 1)
+    weights = [rng.uniform(1, 5) for _ in range(rng.randint(2, 24))]
+    facet_areas = [round(total_area * w / sum(weights), 1) for w in weights]
+    return {
+        "total_area": total_area,
+        "predominant_pitch": pitches[0],
+        "ridges": round(rng.uniform(20, 200), 1),
+        "hips": round(rng.uniform(0, 200), 1),
+        "valleys": round(rng.uniform(0, 150), 1),
+        "rakes": round(rng.uniform(20, 250), 1),
+        "eaves": round(rng.uniform(50, 300), 1),
+        "flashing": round(rng.uniform(0, 60), 1),
+        "step_flashing": round(rng.uniform(0, 60), 1),
+        "pitch_details": [{"pitch": p, "area": a} for p, a in zip(pitches, pitch_areas)],
+        "facets": [{"number": i + 1, "area": a} for i, a in enumerate(facet_areas)],
+    }
+
+
+def _generic_report(values: dict) -> List[str]:
+    lines = [
+        "Report Summary",
+        "Total Area: {total_area:,.1f} sq ft",
+        "Predominant Pitch: {predominant_pitch}",
+        "Ridge Length: {ridges:,.1f} ft",
+        "Hip Length: {hips:,.1f} ft",
+        "Valley Length: {valleys:,.1f} ft",
+        "Rake Length: {rakes:,.1f} ft",
+        "Eave Length: {eaves:,.1f} ft",
+        "Flashing Length: {flashing:,.1f} ft",
+        "Step Flashing Length: {step_flashing:,.1f} ft",
+        "",
+        "Areas per Pitch",
+    ]
+    lines = [line.format(**values) for line in lines]
+    lines += ["{pitch} pitch area: {area:,.1f}".format(**row) for row in values["pitch_details"]]
+    lines += ["", "Facets"]
+    lines += ["Facet {number} area: {area:,.1f}".format(**row) for row in values["facets"]]
+    return lines
+
+
+def _eagleview_report(values: dict) -> List[str]:
+    lines = [
+        "EagleView Premium Report",
+        "Report Summary",
+        "Total Roof Area = {total_area:,.1f} sq ft",
+        "Predominant Pitch = {predominant_pitch}",
+        "Ridges = {ridges:,.1f} ft",
+        "Hips = {hips:,.1f} ft",
+        "Valleys = {valleys:,.1f} ft",
+        "Rakes = {rakes:,.1f} ft",
+        "Eaves/Starter = {eaves:,.1f} ft",
+        "Flashing = {flashing:,.1f} ft",
+        "Step flashing = {step_flashing:,.1f} ft",
+        "",
+        "Areas per Pitch",
+    ]
+    lines = [line.format(**values) for line in lines]
+    lines += ["Pitch {pitch} Area (sq ft) {area:,.1f}".format(**row) for row in values["pitch_details"]]
+    return lines
+
+
+def _hover_report(values: dict) -> List[str]:
+    lines = [
+        "HOVER Complete Measurements",
+        "Roof Area: {total_area:,.1f} ft\u00b2",
+        "Primary Pitch: {predominant_pitch}",
+        "Ridges: {ridges:,.1f} ft",
+        "Hips: {hips:,.1f} ft",
+        "Valleys: {valleys:,.1f} ft",
+        "Rakes: {rakes:,.1f} ft",
+        "Eaves: {eaves:,.1f} ft",
+        "Flashing: {flashing:,.1f} ft",
+        "Step Flashing: {step_flashing:,.1f} ft",
+        "",
+        "Pitch Breakdown",
+    ]
+    lines = [line.format(**values) for line in lines]
+    lines += ["{pitch} {area:,.1f} ft\u00b2".format(**row) for row in values["pitch_details"]]
+    return lines
+
+
+def _gaf_quickmeasure_report(values: dict) -> List[str]:
+    lines = [
+        "GAF QuickMeasure Roof Report",
+        "Total Roof Area: {total_area:,.1f} sq ft",
+        "Predominant Roof Pitch: {predominant_pitch}",
+        "Ridge: {ridges:,.1f} ft",
+        "Hip: {hips:,.1f} ft",
+        "Valley: {valleys:,.1f} ft",
+        "Rake: {rakes:,.1f} ft",
+        "Eave: {eaves:,.1f} ft",
+        "Wall Flashing: {flashing:,.1f} ft",
+        "Step Flashing: {step_flashing:,.1f} ft",
+        "",
+        "Areas by Pitch",
+    ]
+    lines = [line.format(**values) for line in lines]
+    lines += ["Roof Pitch {pitch} - {area:,.1f} sq ft".format(**row) for row in values["pitch_details"]]
+    return lines
+
+
+# Summary layouts following the labels each vendor table in extraction.py expects
+REPORT_FORMATS: Dict[str, Callable[[dict], List[str]]] = {
+    "generic": _generic_report,
+    "eagleview": _eagleview_report,
+    "hover": _hover_report,
+    "gaf_quickmeasure": _gaf_quickmeasure_report,
+}
+
+
+def expected_measurements(seed: int = 0, vendor: str = "generic") -> dict:
+    """What extraction should find in ``report_text(seed, vendor)``."""
+    values = report_values(seed)
+    if vendor != "generic":
+        # Only the generic layout prints a facet table
+        values["facets"] = []
+    return values
+
+
+def report_text(seed: int = 0, vendor: str = "generic") -> str:
+    return "\n".join(REPORT_FORMATS[vendor](report_values(seed))) + "\n"
+
+
+def legacy_extract_measurements(text: str) -> dict:
+    # The original regex scans from main.py, kept to check and time the extractor against
+    measurements = {
+        "total_area": 0.0, "predominant_pitch": "", "ridges": 0.0, "hips": 0.0,
+        "valleys": 0.0, "rakes": 0.0, "eaves": 0.0, "flashing": 0.0,
+        "step_flashing": 0.0, "pitch_details": [], "facets": [],
+    }
+    area_match = re.search(r"Total Area:\s*([\d,]+(?:\.\d+)?)", text)
+    if area_match:
+        measurements["total_area"] = float(area_match.group(1).replace(",", ""))
+    pitch_match = re.search(r"Predominant Pitch:\s*([\d/]+)", text)
+    if pitch_match:
+        measurements["predominant_pitch"] = pitch_match.group(1)
+    length_patterns = {
+        "ridges": r"Ridge Length:\s*([\d,]+(?:\.\d+)?)",
+        "hips": r"Hip Length:\s*([\d,]+(?:\.\d+)?)",
+        "valleys": r"Valley Length:\s*([\d,]+(?:\.\d+)?)",
+        "rakes": r"Rake Length:\s*([\d,]+(?:\.\d+)?)",
+        "eaves": r"Eave Length:\s*([\d,]+(?:\.\d+)?)",
+        "flashing": r"Flashing Length:\s*([\d,]+(?:\.\d+)?)",
+        "step_flashing": r"Step Flashing Length:\s*([\d,]+(?:\.\d+)?)",
+    }
+    for key, pattern in length_patterns.items():
+        match = re.search(pattern, text)
+        if match:
+            measurements[key] = float(match.group(1).replace(",", ""))
+    for match in re.finditer(r"([\d/]+)\s*pitch\s*area:\s*([\d,]+(?:\.\d+)?)", text, re.IGNORECASE):
+        measurements["pitch_details"].append(
+            {"pitch": match.group(1), "area": float(match.group(2).replace(",", ""))}
+        )
+    for match in re.finditer(r"Facet\s*(\d+)\s*area:\s*([\d,]+(?:\.\d+)?)", text, re.IGNORECASE):
+        measurements["facets"].append(
+            {"number": int(match.group(1)), "area": float(match.group(2).replace(",", ""))}
+        )
+    return measurements
+
+
+def make_report_pdf(
+    pages: int = 1,
+    images: bool = False,
+    seed: int = 0,
+    vendor: str = "generic",
+    summary_page: int = 0,
+    outline: bool = False,
+    cover: bool = False,
+) -> bytes:
+    """Build a report whose ``summary_page`` holds the measurements.
+
+    Other pages carry boilerplate text, plus an incompressible image per
+    page when ``images`` is set to mimic aerial photography. With
+    ``outline`` the document gets a bookmark pointing at the summary; with
+    ``cover`` the report's title line, which names the vendor, moves from
+    the summary to the first page.
+    """
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        title, summary = report_text(seed, vendor).split("\n", 1)
+        if number == summary_page:
+            page.insert_text((36, 54), summary if cover else title + "\n" + summary, fontsize=9)
+            continue
+        if cover and number == 0:
+            page.insert_text((36, 54), title, fontsize=14)
+            continue
+        page.insert_text((36, 54), f"Page {number + 1}\n" + FILLER * 6, fontsize=8)
+        if images:
+            noise = rng.randbytes(600 * 400 * 3)
+            pixmap = fitz.Pixmap(fitz.csRGB, 600, 400, noise, False)
+            page.insert_image(fitz.Rect(36, 200, 576, 560), pixmap=pixmap)
+    if outline:
+        doc.set_toc([[1, "Terms and Conditions", 1], [1, "Report Summary", summary_page + 1]])
+    data = doc.tobytes(deflate=True)
+    doc.close()
+    return data
+
+
+class _PdfHandler(BaseHTTPRequestHandler):
+    files: Dict[str, bytes] = {}
+
+    def do_GET(self):
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", '"%s"' % hashlib.md5(data).hexdigest())
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_pdfs(files: Dict[str, bytes]) -> Iterator[str]:
+    """Serve ``{"/name.pdf": data}`` from memory, yielding the base URL."""
+    handler = type("Handler", (_PdfHandler,), {"files": files})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def peak_rss_kib(pid: int) -> int:
+    # VmHWM is the process's peak resident set size (Linux only)
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    return 0
+
+
+def reset_peak_rss(pid: int) -> bool:
+    # Writing 5 to clear_refs restarts VmHWM from the current RSS
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as handle:
+            handle.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def child_pids(pid: int):
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as handle:
+            children += [int(child) for child in handle.read().split()]
+    return children
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def run_backend(env: Optional[Dict[str, str]] = None) -> Iterator[subprocess.Popen]:
+    """Start the backend under uvicorn; the process gets ``base_url`` set."""
+    import httpx
+
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+    )
+    process.base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(process.base_url + "/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("Backend did not start")
+                time.sleep(0.1)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
@@ -0,0 +1,203 @@
+"""End-to-end benchmark of /api/process-pdf against synthetic reports.
+
+Run from python-backend/:
+
+    python benchmarks/run_suite.py                  # run and compare with baseline.json
+    python benchmarks/run_suite.py --save-baseline  # run and record a new baseline
+
+Every scenario serves one generated report from a local HTTP server and
+posts it to a fresh backend at fixed concurrency, with the extraction
+cache disabled so each request does the full download-parse-extract
+cycle. Results are written as JSON; when a baseline exists, metrics that
+moved the wrong way by more than --threshold are listed and the exit
+status is 1. Baselines are only comparable on the same machine.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import httpx
+
+from fixtures import (
+    child_pids,
+    make_report_pdf,
+    peak_rss_kib,
+    reset_peak_rss,
+    run_backend,
+    serve_pdfs,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+SCENARIOS = [
+    ("text-1p", 1, False),
+    ("text-10p", 10, False),
+    ("text-30p", 30, False),
+    ("text-60p", 60, False),
+    ("images-1p", 1, True),
+    ("images-10p", 10, True),
+    ("images-30p", 30, True),
+    ("images-60p", 60, True),
+]
+
+# Which direction is worse for each reported metric
+LOWER_IS_BETTER = ["p50_ms", "p90_ms", "p99_ms", "server_peak_rss_mib", "worker_peak_rss_mib"]
+HIGHER_IS_BETTER = ["requests_per_second"]
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_server_timing(header: str) -> dict:
+    stages = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, _, duration = entry.partition(";dur=")
+        stages[name] = float(duration)
+    return stages
+
+
+async def load(base_url: str, file_url: str, requests: int, concurrency: int):
+    latencies, stages, failures = [], [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async def worker():
+            nonlocal failures
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/process-pdf", json={"file_url": file_url}, headers={"X-Profile": "1"}
+                )
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    failures += 1
+                    continue
+                stages.append(parse_server_timing(response.headers.get("server-timing", "")))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, stages, failures, elapsed
+
+
+def run_scenario(backend, files_url: str, name: str, args) -> dict:
+    file_url = f"{files_url}/{name}.pdf"
+    # Warm up worker processes and connection pools outside the measurement
+    asyncio.run(load(backend.base_url, file_url, args.concurrency, args.concurrency))
+
+    reset_peak_rss(backend.pid)
+    for pid in child_pids(backend.pid):
+        reset_peak_rss(pid)
+    latencies, stages, failures, elapsed = asyncio.run(
+        load(backend.base_url, file_url, args.requests, args.concurrency)
+    )
+
+    stage_names = sorted({stage for entry in stages for stage in entry})
+    return {
+        "requests": args.requests,
+        "failures": failures,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "requests_per_second": round(args.requests / elapsed, 2),
+        "server_peak_rss_mib": round(peak_rss_kib(backend.pid) / 1024, 1),
+        "worker_peak_rss_mib": round(
+            max((peak_rss_kib(pid) for pid in child_pids(backend.pid)), default=0) / 1024, 1
+        ),
+        # Mean server-side milliseconds per stage, from Server-Timing
+        "stages_ms": {
+            stage: round(statistics.mean(entry.get(stage, 0.0) for entry in stages), 2)
+            for stage in stage_names
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(f"{name} {metric}: {old} -> {new} ({change:+.0%} worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="only run these scenarios")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="also write results to this file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional change")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s[0] in args.scenario]
+    files = {f"/{name}.pdf": make_report_pdf(pages, images, seed=pages) for name, pages, images in scenarios}
+
+    env = {
+        "CACHE_MAX_ENTRIES": "0",
+        "PDF_MAX_PENDING": str(args.concurrency * 4),
+    }
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+    with serve_pdfs(files) as files_url, run_backend(env) as backend:
+        for name, pages, images in scenarios:
+            results["scenarios"][name] = run_scenario(backend, files_url, name, args)
+            print(name, json.dumps(results["scenarios"][name]), flush=True)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    with open(args.baseline) as handle:
+        regressions = compare(results, json.load(handle), args.threshold)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print("  " + line)
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
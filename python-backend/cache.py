@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import config
+
+
+class ExtractionCache:
+    """Measurement results keyed by PDF content hash and extractor version.
+
+    Entries live in an in-process LRU and, when ``db_path`` is set, in a
+    SQLite file that survives restarts. Recently seen URLs map to their
+    content hash so repeat uploads can skip the download entirely; after
+    that, the ETag last served for a URL lets the download be revalidated
+    with ``If-None-Match`` instead of fetched again.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_entries: int = config.CACHE_MAX_ENTRIES,
+        ttl: float = config.CACHE_TTL_SECONDS,
+        url_ttl: float = config.CACHE_URL_TTL_SECONDS,
+        db_path: str = config.CACHE_DB_PATH,
+    ):
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.url_ttl = url_ttl
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._urls: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # URL -> (seen, ETag, digest); ETags only identify content per URL
+        self._etags: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "url_hits": 0,
+            "etag_hits": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS measurements ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _key(self, digest: str) -> str:
+        return f"{self.version}:{digest}"
+
+    def get(self, digest: str) -> Optional[dict]:
+        key = self._key(digest)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM measurements WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    value = json.loads(row[0])
+                    self._remember(self._entries, key, (row[1], value))
+                    self.counters["disk_hits"] += 1
+                    return value
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, digest: str, value: dict):
+        key = self._key(digest)
+        now = time.time()
+        with self._lock:
+            self._remember(self._entries, key, (now, value))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO measurements (key, value, created) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(value), now),
+                )
+                self._db.execute(
+                    "DELETE FROM measurements WHERE created < ?", (now - self.ttl,)
+                )
+                self._db.commit()
+
+    def remember_source(self, url: str, digest: str, etag: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            self._remember(self._urls, url, (now, digest))
+            if etag:
+                self._remember(self._etags, url, (now, etag, digest))
+            else:
+                self._etags.pop(url, None)
+
+    def digest_for_url(self, url: str) -> Optional[str]:
+        entry = self._recent(self._urls, url, self.url_ttl)
+        if entry is None:
+            return None
+        with self._lock:
+            self.counters["url_hits"] += 1
+        return entry[0]
+
+    def etag_for_url(self, url: str) -> Optional[Tuple[str, str]]:
+        """The ETag last served for ``url`` and the digest of that content."""
+        # Kept as long as the results themselves, since the server revalidates it
+        return self._recent(self._etags, url, self.ttl)
+
+    def record_etag_hit(self):
+        with self._lock:
+            self.counters["etag_hits"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = (
+                self.counters["memory_hits"]
+                + self.counters["disk_hits"]
+                + self.counters["misses"]
+            )
+            hits = lookups - self.counters["misses"]
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "disk_enabled": self._db is not None,
+                "version": self.version,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _recent(self, table: OrderedDict, key: str, ttl: float) -> Optional[tuple]:
+        # Returns the entry without its timestamp, if seen within ``ttl``
+        with self._lock:
+            entry = table.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > ttl:
+                del table[key]
+                return None
+            return entry[1:]
+
+    def _remember(self, table: OrderedDict, key: str, value: tuple):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
@@ -0,0 +1,44 @@
+import os
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# Download settings
+DOWNLOAD_CONNECT_TIMEOUT = _float("DOWNLOAD_CONNECT_TIMEOUT", 5.0)
+DOWNLOAD_READ_TIMEOUT = _float("DOWNLOAD_READ_TIMEOUT", 30.0)
+HTTP_MAX_CONNECTIONS = _int("HTTP_MAX_CONNECTIONS", 100)
+HTTP_MAX_KEEPALIVE = _int("HTTP_MAX_KEEPALIVE", 20)
+MAX_PDF_BYTES = _int("MAX_PDF_BYTES", 50 * 1024 * 1024)
+
+# PDF worker pool settings ("process" or "thread")
+PDF_WORKER_KIND = os.getenv("PDF_WORKER_KIND", "process")
+PDF_WORKERS = _int("PDF_WORKERS", os.cpu_count() or 1)
+PDF_MAX_PENDING = _int("PDF_MAX_PENDING", PDF_WORKERS * 8)
+# Pool slots kept free of batch and background work for interactive requests
+PDF_RESERVED_SLOTS = _int("PDF_RESERVED_SLOTS", max(1, PDF_MAX_PENDING // 4))
+
+# Extraction cache settings (empty CACHE_DB_PATH disables the disk tier)
+CACHE_MAX_ENTRIES = _int("CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL_SECONDS = _float("CACHE_TTL_SECONDS", 7 * 24 * 3600)
+CACHE_URL_TTL_SECONDS = _float("CACHE_URL_TTL_SECONDS", 300)
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+
+# Batch processing settings
+BATCH_MAX_ITEMS = _int("BATCH_MAX_ITEMS", 500)
+BATCH_CONCURRENCY = _int("BATCH_CONCURRENCY", 32)
+
+# Where incoming PDFs are spooled while they are processed (default: system temp dir)
+SPOOL_DIR = os.getenv("SPOOL_DIR") or None
+SPOOL_CHUNK_BYTES = _int("SPOOL_CHUNK_BYTES", 64 * 1024)
+
+# Background job settings (JOB_STORE is "memory" or "sqlite")
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+JOB_CONCURRENCY = _int("JOB_CONCURRENCY", PDF_WORKERS * 2)
+JOB_TTL_SECONDS = _float("JOB_TTL_SECONDS", 24 * 3600)
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import httpx
+
+import config
+from spool import SpooledPdf, check_length, spool
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadTimeoutError(DownloadError):
+    pass
+
+
+class InvalidUrlError(DownloadError):
+    pass
+
+
+@dataclass
+class Download:
+    # ``file`` is None when the server answered 304 Not Modified
+    file: Optional[SpooledPdf]
+    sha256: str
+    etag: Optional[str]
+
+
+class Downloader:
+    """Pooled async HTTP client that streams files to disk with a size cap."""
+
+    def __init__(self, max_bytes: int = config.MAX_PDF_BYTES):
+        self.max_bytes = max_bytes
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self):
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                config.DOWNLOAD_READ_TIMEOUT,
+                connect=config.DOWNLOAD_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+            ),
+            follow_redirects=True,
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str, known: Optional[Tuple[str, str]] = None) -> Download:
+        """Download ``url`` to a temp file.
+
+        ``known`` is the ``(etag, sha256)`` of a previous download of the same
+        URL. It is sent as ``If-None-Match``, and if the server answers 304
+        the body is skipped and the previous digest returned.
+        """
+        if self._client is None:
+            raise RuntimeError("Downloader has not been started")
+
+        headers = {"If-None-Match": known[0]} if known else None
+        try:
+            async with self._client.stream("GET", url, headers=headers) as response:
+                if known and response.status_code == 304:
+                    return Download(file=None, sha256=known[1], etag=known[0])
+                response.raise_for_status()
+
+                etag = response.headers.get("etag")
+                check_length(response.headers.get("content-length"), self.max_bytes)
+                spooled = await spool(
+                    response.aiter_bytes(config.SPOOL_CHUNK_BYTES), self.max_bytes
+                )
+                return Download(file=spooled, sha256=spooled.sha256, etag=etag)
+        except (httpx.InvalidURL, httpx.UnsupportedProtocol) as e:
+            # InvalidURL is not an HTTPError, so it needs catching on its own
+            raise InvalidUrlError(f"Invalid file URL: {str(e)}") from e
+        except httpx.TimeoutException as e:
+            raise DownloadTimeoutError(f"Timed out downloading {url}") from e
+        except httpx.HTTPError as e:
+            raise DownloadError(str(e)) from e
@@ -0,0 +1,144 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from models import EstimateResult, LaborItem, MaterialItem, PitchDetail
+
+# Mirrors MATERIAL_PRICES in supabase/functions/generate-estimate/calculator.ts.
+# The first line is the roofing material itself and is bought with waste;
+# the rest are priced on the plain roof area.
+MATERIAL_LINES: Dict[str, List[tuple]] = {
+    "SHINGLE": [
+        ("SHINGLE Material", 4.50),
+        ("Underlayment", 0.45),
+        ("Starter Strip", 0.30),
+        ("Ridge Caps", 0.25),
+        ("Nails/Fasteners", 0.15),
+    ],
+    "TILE": [
+        ("TILE Material", 8.75),
+        ("Underlayment", 0.65),
+        ("Starter Strip", 0.45),
+        ("Ridge Caps", 0.35),
+        ("Nails/Fasteners", 0.20),
+    ],
+    "METAL": [
+        ("METAL Material", 7.25),
+        ("Underlayment", 0.55),
+        ("Fasteners", 0.25),
+        ("Trim", 0.45),
+        ("Sealant", 0.15),
+    ],
+}
+
+# Mirrors LABOR_RATES in calculator.ts, per sq ft by pitch
+LABOR_RATES: Dict[str, float] = {
+    "2/12": 2.25,
+    "3/12": 2.50,
+    "4/12": 2.75,
+    "5/12": 3.00,
+    "6/12": 3.25,
+    "7/12": 3.75,
+    "8/12": 4.25,
+    "9/12": 4.75,
+    "10/12": 5.25,
+    "11/12": 5.75,
+    "12/12": 6.25,
+}
+DEFAULT_PITCH = "4/12"
+
+# Price tables as arrays, indexed once at import
+CATEGORIES = list(MATERIAL_LINES)
+_CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+_LINE_RATES = np.array([[rate for _, rate in MATERIAL_LINES[c]] for c in CATEGORIES])
+_PITCHES = list(LABOR_RATES)
+_PITCH_INDEX = {pitch: i for i, pitch in enumerate(_PITCHES)}
+_PITCH_RATES = np.array([LABOR_RATES[p] for p in _PITCHES])
+
+
+class InvalidCategoryError(ValueError):
+    pass
+
+
+def category_indices(categories: Sequence[str]) -> np.ndarray:
+    try:
+        return np.array([_CATEGORY_INDEX[c] for c in categories], dtype=np.intp)
+    except KeyError as e:
+        raise InvalidCategoryError(f"Invalid roofing category: {e.args[0]}") from None
+
+
+def pitch_rate_matrix(breakdowns: Sequence[Sequence[PitchDetail]]):
+    """Pad ragged pitch breakdowns into (scenario, row) area and rate arrays."""
+    width = max((len(b) for b in breakdowns), default=0)
+    areas = np.zeros((len(breakdowns), width))
+    index = np.full((len(breakdowns), width), _PITCH_INDEX[DEFAULT_PITCH], dtype=np.intp)
+    for i, breakdown in enumerate(breakdowns):
+        areas[i, :len(breakdown)] = [row.area for row in breakdown]
+        index[i, :len(breakdown)] = [
+            _PITCH_INDEX.get(row.pitch, _PITCH_INDEX[DEFAULT_PITCH]) for row in breakdown
+        ]
+    return areas, _PITCH_RATES[index]
+
+
+def price_matrix(
+    total_area: float,
+    categories: Sequence[str],
+    waste_percentages: Sequence[float],
+    profit_margins: Sequence[float],
+    pitch_breakdowns: Sequence[Sequence[PitchDetail]],
+) -> Dict[str, np.ndarray]:
+    """Price every category x waste x margin x pitch breakdown at once.
+
+    Returns material costs (category, waste), labor costs (breakdown) and
+    total prices (category, waste, margin, breakdown).
+    """
+    rates = _LINE_RATES[category_indices(categories)]
+    waste = 1 + np.asarray(waste_percentages, dtype=float) / 100
+    margins = 1 + np.asarray(profit_margins, dtype=float) / 100
+
+    # Main material scales with waste, every other line with the plain area
+    material = total_area * (rates[:, :1] * waste[None, :] + rates[:, 1:].sum(axis=1, keepdims=True))
+
+    areas, pitch_rates = pitch_rate_matrix(pitch_breakdowns)
+    labor = (areas * pitch_rates).sum(axis=1)
+
+    cost = material[:, :, None] + labor[None, None, :]
+    totals = cost[:, :, None, :] * margins[None, None, :, None]
+    return {"material": material, "labor": labor, "totals": totals}
+
+
+def line_items(
+    total_area: float,
+    category: str,
+    waste_percentage: float,
+    profit_margin: float,
+    pitch_breakdown: Sequence[PitchDetail],
+) -> EstimateResult:
+    """Itemised estimate for one scenario, matching calculateEstimate()."""
+    rates = _LINE_RATES[category_indices([category])[0]]
+    quantities = np.full(len(rates), float(total_area))
+    quantities[0] *= 1 + waste_percentage / 100
+    material_totals = quantities * rates
+
+    areas, pitch_rates = pitch_rate_matrix([pitch_breakdown])
+    labor_totals = areas[0] * pitch_rates[0]
+
+    total_material_cost = float(material_totals.sum())
+    total_labor_cost = float(labor_totals.sum())
+    total_cost = total_material_cost + total_labor_cost
+    return EstimateResult(
+        materials=[
+            MaterialItem(name=name, base_price=rate, unit="sq ft", quantity=float(q), total=float(t))
+            for (name, rate), q, t in zip(MATERIAL_LINES[category], quantities, material_totals)
+        ],
+        labor=[
+            LaborItem(pitch=row.pitch, rate=float(r), area=row.area, total=float(t))
+            for row, r, t in zip(pitch_breakdown, pitch_rates[0], labor_totals)
+        ],
+        profit_margin=profit_margin,
+        total_material_cost=total_material_cost,
+        total_labor_cost=total_labor_cost,
+        total_cost=total_cost,
+        total_price=total_cost * (1 + profit_margin / 100),
+        category=category,
+    )
@@ -0,0 +1,344 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import RoofMeasurements
+
+# Bump whenever extraction output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = "4"
+
+NUMBER = r"([\d,]+(?:\.\d+)?)"
+PITCH = r"([\d/]+)"
+SEPARATOR = r"\s*[:=]\s*"
+
+# Characters of the values a row may print before its keyword
+NUMBER_CHARS = "0123456789,."
+PITCH_CHARS = "0123456789/"
+
+LENGTH_FIELDS = ["ridges", "hips", "valleys", "rakes", "eaves", "flashing", "step_flashing"]
+SCALAR_FIELDS = ["total_area", "predominant_pitch"] + LENGTH_FIELDS
+TABLE_FIELDS = ["pitch_details", "facets"]
+
+# Vendor branding is looked for in the first few KB only
+DETECT_WINDOW = 4096
+
+
+@dataclass
+class RowPattern:
+    """One table row layout.
+
+    ``keyword`` is literal text every row contains, ``regex`` parses the
+    whole row (two groups, the pitch or facet number and the area) and is
+    matched case-insensitively. ``lead`` lists, in order, the character
+    sets of the whitespace-separated values printed before the keyword;
+    it is empty when rows start with their keyword.
+    """
+    keyword: str
+    regex: str
+    lead: Tuple[str, ...] = ()
+
+
+@dataclass
+class VendorPatterns:
+    """Labels used by one report vendor.
+
+    ``labels`` maps each scalar field to the literal label text printed
+    before its value. ``pitch_rows`` and ``facet_rows`` are the
+    :class:`RowPattern` layouts of the two tables. ``marker`` is literal
+    text identifying the vendor's reports. ``required`` lists the fields
+    that must be found before extraction may stop early, by default every
+    field the vendor has a label or row for.
+    """
+    name: str
+    marker: Optional[str] = None
+    labels: Dict[str, List[str]] = field(default_factory=dict)
+    pitch_rows: List[RowPattern] = field(default_factory=list)
+    facet_rows: List[RowPattern] = field(default_factory=list)
+    required: Optional[List[str]] = None
+
+    def __post_init__(self):
+        if self.required is None:
+            self.required = list(self.labels)
+            if self.pitch_rows:
+                self.required.append("pitch_details")
+            if self.facet_rows:
+                self.required.append("facets")
+
+
+GENERIC = VendorPatterns(
+    name="generic",
+    labels={
+        "total_area": ["Total Area"],
+        "predominant_pitch": ["Predominant Pitch"],
+        "ridges": ["Ridge Length"],
+        "hips": ["Hip Length"],
+        "valleys": ["Valley Length"],
+        "rakes": ["Rake Length"],
+        "eaves": ["Eave Length"],
+        "flashing": ["Flashing Length"],
+        "step_flashing": ["Step Flashing Length"],
+    },
+    pitch_rows=[RowPattern("pitch", rf"{PITCH}\s*pitch\s*area:\s*{NUMBER}", lead=(PITCH_CHARS,))],
+    facet_rows=[RowPattern("facet", rf"Facet\s*(\d+)\s*area:\s*{NUMBER}")],
+)
+
+EAGLEVIEW = VendorPatterns(
+    name="eagleview",
+    marker="EagleView",
+    labels={
+        "total_area": ["Total Roof Area"],
+        "ridges": ["Ridges"],
+        "hips": ["Hips"],
+        "valleys": ["Valleys"],
+        "rakes": ["Rakes"],
+        "eaves": ["Eaves/Starter", "Eaves"],
+        "flashing": ["Flashing"],
+        "step_flashing": ["Step flashing"],
+    },
+    pitch_rows=[RowPattern("pitch", rf"Pitch\s+{PITCH}\s+Area\s*\(sq\s*ft\)\s*{NUMBER}")],
+)
+
+HOVER = VendorPatterns(
+    name="hover",
+    marker="HOVER",
+    labels={
+        "total_area": ["Roof Area", "Total Roof Area"],
+        "predominant_pitch": ["Primary Pitch"],
+        "ridges": ["Ridges", "Ridge"],
+        "hips": ["Hips", "Hip"],
+        "valleys": ["Valleys", "Valley"],
+        "rakes": ["Rakes", "Rake"],
+        "eaves": ["Eaves", "Eave"],
+        "flashing": ["Flashing"],
+        "step_flashing": ["Step Flashing"],
+    },
+    pitch_rows=[RowPattern("ft²", rf"{PITCH}\s+{NUMBER}\s*ft²", lead=(PITCH_CHARS, NUMBER_CHARS))],
+)
+
+GAF_QUICKMEASURE = VendorPatterns(
+    name="gaf_quickmeasure",
+    marker="QuickMeasure",
+    labels={
+        "total_area": ["Total Roof Area", "Total Area (All Pitches)"],
+        "predominant_pitch": ["Predominant Roof Pitch"],
+        "ridges": ["Ridge"],
+        "hips": ["Hip"],
+        "valleys": ["Valley"],
+        "rakes": ["Rake"],
+        "eaves": ["Eave"],
+        "flashing": ["Wall Flashing"],
+        "step_flashing": ["Step Flashing"],
+    },
+    pitch_rows=[RowPattern("roof pitch", rf"Roof Pitch\s+{PITCH}\s*-\s*{NUMBER}\s*sq\s*ft")],
+)
+
+VENDORS: Dict[str, VendorPatterns] = {}
+
+
+class CompiledExtractor:
+    """A vendor's fields found by literal keyword search.
+
+    Keywords are located with ``str.find`` on lower-cased text, which is
+    far cheaper than ``re`` scanning for patterns that start with a digit
+    class or use IGNORECASE. Each hit is then parsed by its field's full
+    pattern anchored at the hit, labels against the original text so they
+    match as printed, and rows from the start of the values printed before
+    their keyword.
+    """
+
+    def __init__(self, vendor: VendorPatterns):
+        self.vendor = vendor
+        self.required = set(vendor.required)
+        self._labels: Dict[str, List[Tuple[str, "re.Pattern"]]] = {}
+        self._rows: Dict[str, List[Tuple[str, "re.Pattern", Tuple[str, ...]]]] = {}
+
+        # The vendor's own labels are tried before the generic ones
+        sources = [vendor] if vendor is GENERIC else [vendor, GENERIC]
+        for source in sources:
+            for name, labels in source.labels.items():
+                value = PITCH if name == "predominant_pitch" else NUMBER
+                for label in labels:
+                    parser = re.compile(re.escape(label) + SEPARATOR + value)
+                    self._labels.setdefault(name, []).append((label.lower(), parser))
+            for name, rows in (("pitch_details", source.pitch_rows), ("facets", source.facet_rows)):
+                for row in rows:
+                    parser = re.compile(row.regex, re.IGNORECASE)
+                    self._rows.setdefault(name, []).append((row.keyword.lower(), parser, row.lead))
+
+        # Longer labels containing a label, so "Flashing" is not read from "Step Flashing"
+        keywords = {keyword for labels in self._labels.values() for keyword, _ in labels}
+        self._shadows = {
+            keyword: [(longer, longer.index(keyword)) for longer in keywords if keyword in longer and longer != keyword]
+            for keyword in keywords
+        }
+
+    def scan(self, text: str, state: "ExtractionState") -> bool:
+        """Feed one chunk of text; returns True once nothing more is needed.
+
+        A table may continue anywhere in the chunk holding it or spill onto
+        the next, so tables only count as finished at the end of a chunk
+        that added no rows to them.
+        """
+        folded = text.lower()
+        if len(folded) != len(text):
+            # A few characters lower-case to two; fold per character instead
+            folded = "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+        for name, labels in self._labels.items():
+            if name not in state.scalars:
+                match = self._first_label(text, folded, labels)
+                if match is not None:
+                    state.add(name, match.groups())
+
+        rows_added = False
+        for name, rows in self._rows.items():
+            matches = sorted(
+                (match for row in rows for match in self._find_rows(text, folded, *row)),
+                key=lambda match: match.start(),
+            )
+            end = 0
+            for match in matches:
+                # Layouts of one table may both parse a row; keep the first
+                if match.start() >= end:
+                    state.add(name, match.groups())
+                    end = match.end()
+                    rows_added = True
+
+        return state.complete(self.required) and not rows_added
+
+    def _first_label(self, text: str, folded: str, labels) -> Optional["re.Match"]:
+        # The earliest label of any spelling wins, so later spellings only
+        # search the text before the best hit so far
+        best = None
+        for keyword, parser in labels:
+            end = len(folded) if best is None else best.start() + len(keyword) - 1
+            pos = folded.find(keyword, 0, end)
+            while pos != -1:
+                match = parser.match(text, pos)
+                if match is not None and not self._shadowed(folded, keyword, pos):
+                    best = match
+                    break
+                pos = folded.find(keyword, pos + 1, end)
+        return best
+
+    def _shadowed(self, folded: str, keyword: str, pos: int) -> bool:
+        return any(
+            offset <= pos and folded.startswith(longer, pos - offset)
+            for longer, offset in self._shadows[keyword]
+        )
+
+    @staticmethod
+    def _find_rows(text: str, folded: str, keyword: str, parser: "re.Pattern", lead: Tuple[str, ...]):
+        pos = folded.find(keyword)
+        while pos != -1:
+            # Step back over the values printed before the keyword
+            start = pos
+            for chars in reversed(lead):
+                while start and text[start - 1].isspace():
+                    start -= 1
+                while start and text[start - 1] in chars:
+                    start -= 1
+            match = parser.match(text, start)
+            if match is not None and match.end() > pos:
+                yield match
+            pos = folded.find(keyword, pos + len(keyword))
+
+
+class ExtractionState:
+    def __init__(self):
+        self.scalars: Dict[str, object] = {}
+        self.pitch_details: List[dict] = []
+        self.facets: List[dict] = []
+
+    def add(self, name: str, values: tuple):
+        if name == "pitch_details":
+            self.pitch_details.append({"pitch": values[0], "area": _number(values[1])})
+        elif name == "facets":
+            self.facets.append({"number": int(values[0]), "area": _number(values[1])})
+        elif name not in self.scalars:
+            # First occurrence wins, matching the label's first mention
+            raw = values[0]
+            self.scalars[name] = raw if name == "predominant_pitch" else _number(raw)
+
+    def rows(self) -> int:
+        return len(self.pitch_details) + len(self.facets)
+
+    def complete(self, required: set) -> bool:
+        # Tables only have to have started; callers decide when one has ended
+        for name in required:
+            if name in TABLE_FIELDS:
+                if not getattr(self, name):
+                    return False
+            elif name not in self.scalars:
+                return False
+        return True
+
+    def to_measurements(self) -> RoofMeasurements:
+        measurements = {
+            "total_area": 0.0,
+            "predominant_pitch": "",
+            **{name: 0.0 for name in LENGTH_FIELDS},
+            **self.scalars,
+            "pitch_details": self.pitch_details,
+            "facets": self.facets,
+        }
+
+        # Adjust waste percentage based on roof complexity
+        total_length = sum(measurements[name] for name in ["ridges", "hips", "valleys", "rakes", "eaves"])
+        if total_length > 500:
+            measurements["suggested_waste_percentage"] = 15.0
+        elif total_length > 300:
+            measurements["suggested_waste_percentage"] = 12.5
+        else:
+            measurements["suggested_waste_percentage"] = 10.0
+
+        return RoofMeasurements(**measurements)
+
+
+def _number(raw: str) -> float:
+    return float(raw.replace(",", ""))
+
+
+_EXTRACTORS: Dict[str, CompiledExtractor] = {}
+_MARKERS: Dict[str, str] = {}
+_MARKER_PATTERN: Optional["re.Pattern"] = None
+
+
+def register_vendor(vendor: VendorPatterns):
+    global _MARKER_PATTERN
+    VENDORS[vendor.name] = vendor
+    _EXTRACTORS[vendor.name] = CompiledExtractor(vendor)
+    if vendor.marker:
+        _MARKERS[vendor.marker] = vendor.name
+        _MARKER_PATTERN = re.compile("|".join(re.escape(marker) for marker in _MARKERS))
+
+
+for _vendor in (GENERIC, EAGLEVIEW, HOVER, GAF_QUICKMEASURE):
+    register_vendor(_vendor)
+
+
+def detect_vendor(text: str) -> str:
+    match = _MARKER_PATTERN.search(text, 0, DETECT_WINDOW) if _MARKER_PATTERN else None
+    return _MARKERS[match.group()] if match else GENERIC.name
+
+
+def extract_from_pages(pages: Iterable[str], vendor: Optional[str] = None) -> RoofMeasurements:
+    """Extract measurements from text chunks, consuming only as many as needed.
+
+    The vendor is detected from the first chunk unless given. Iteration
+    stops once every required field is found and the last chunk added no
+    table rows, so a lazy page iterator extracts at most one page past the
+    measurement tables.
+    """
+    state = ExtractionState()
+    extractor = _EXTRACTORS.get(vendor) if vendor else None
+    for text in pages:
+        if extractor is None:
+            extractor = _EXTRACTORS[detect_vendor(text)]
+        if extractor.scan(text, state):
+            break
+    return state.to_measurements()
+
+
+def extract_measurements(text: str, vendor: Optional[str] = None) -> RoofMeasurements:
+    return extract_from_pages([text], vendor)
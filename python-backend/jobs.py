@@ -0,0 +1,343 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+import config
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    id: str
+    # Jobs with the same key share one run while either is queued or running
+    key: str
+    file_url: str
+    status: str = QUEUED
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    # Seconds per stage: queued, download, open, text, extract, total
+    timings: Dict[str, float] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # Process id of the server running the job
+    owner: Optional[int] = None
+
+
+class JobStore(ABC):
+    """Where job records live; the queue itself is always in-process.
+
+    Several server processes may share one store, so a job only runs in
+    the process that claims it.
+    """
+
+    @abstractmethod
+    def add(self, job: Job):
+        ...
+
+    @abstractmethod
+    def save(self, job: Job):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def find_active(self, key: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def unfinished(self) -> List[Job]:
+        ...
+
+    @abstractmethod
+    def claim(self, job_id: str, owner: int) -> Optional[Job]:
+        """Mark a queued job as running in ``owner``; None if it is not queued."""
+
+    @abstractmethod
+    def requeue(self, job: Job) -> bool:
+        """Put a running job back in the queue, unless its owner has changed."""
+
+    @abstractmethod
+    def prune(self, before: float):
+        ...
+
+    def close(self):
+        pass
+
+
+class MemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+
+    def add(self, job: Job):
+        self._jobs[job.id] = job
+
+    def save(self, job: Job):
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def find_active(self, key: str) -> Optional[Job]:
+        for job in self._jobs.values():
+            if job.key == key and job.status in ACTIVE:
+                return job
+        return None
+
+    def unfinished(self) -> List[Job]:
+        return [job for job in self._jobs.values() if job.status in ACTIVE]
+
+    def claim(self, job_id: str, owner: int) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != QUEUED:
+            return None
+        job.status = RUNNING
+        job.owner = owner
+        return job
+
+    def requeue(self, job: Job) -> bool:
+        current = self._jobs.get(job.id)
+        if current is None or current.status != RUNNING or current.owner != job.owner:
+            return False
+        current.status = QUEUED
+        current.owner = None
+        return True
+
+    def prune(self, before: float):
+        for job_id in [
+            job.id for job in self._jobs.values()
+            if job.status not in ACTIVE and (job.finished_at or 0) < before
+        ]:
+            del self._jobs[job_id]
+
+
+class SqliteJobStore(JobStore):
+    """Job records in SQLite, so queued work and results survive restarts."""
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, key TEXT NOT NULL, status TEXT NOT NULL, "
+            "finished_at REAL, data TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+        self._db.commit()
+
+    def add(self, job: Job):
+        self.save(job)
+
+    def save(self, job: Job):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, key, status, finished_at, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.key, job.status, job.finished_at, json.dumps(asdict(job))),
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._one("SELECT data FROM jobs WHERE id = ?", (job_id,))
+
+    def find_active(self, key: str) -> Optional[Job]:
+        return self._one(
+            "SELECT data FROM jobs WHERE key = ? AND status IN (?, ?)", (key, *ACTIVE)
+        )
+
+    def unfinished(self) -> List[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?)", ACTIVE
+            ).fetchall()
+        return [Job(**json.loads(row[0])) for row in rows]
+
+    def claim(self, job_id: str, owner: int) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM jobs WHERE id = ? AND status = ?", (job_id, QUEUED)
+            ).fetchone()
+            if row is None:
+                return None
+            job = Job(**json.loads(row[0]))
+            job.status = RUNNING
+            job.owner = owner
+            # Of several processes racing for the job, only one finds it still queued
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = ?, data = ? WHERE id = ? AND status = ?",
+                (RUNNING, json.dumps(asdict(job)), job_id, QUEUED),
+            ).rowcount
+            self._db.commit()
+        return job if claimed else None
+
+    def requeue(self, job: Job) -> bool:
+        owner = job.owner
+        queued = Job(**{**asdict(job), "status": QUEUED, "owner": None})
+        with self._lock:
+            requeued = self._db.execute(
+                "UPDATE jobs SET status = ?, data = ? WHERE id = ? AND status = ? "
+                "AND json_extract(data, '$.owner') IS ?",
+                (QUEUED, json.dumps(asdict(queued)), job.id, RUNNING, owner),
+            ).rowcount
+            self._db.commit()
+        return bool(requeued)
+
+    def prune(self, before: float):
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?",
+                (*ACTIVE, before),
+            )
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def _one(self, query: str, params: tuple) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(query, params).fetchone()
+        return Job(**json.loads(row[0])) if row else None
+
+
+def create_store(kind: str = config.JOB_STORE, path: str = config.JOB_DB_PATH) -> JobStore:
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "sqlite":
+        return SqliteJobStore(path)
+    raise ValueError(f"Unknown job store: {kind}")
+
+
+# Processes one job: takes the file URL and a dict to fill with stage timings
+JobHandler = Callable[[str, Dict[str, float]], Awaitable[dict]]
+
+
+class JobQueue:
+    """Runs PDF jobs in the background with a fixed number of consumers.
+
+    The heavy lifting still happens in the shared worker pool; consumers
+    only bound how many jobs are in progress at once.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        store: Optional[JobStore] = None,
+        concurrency: int = config.JOB_CONCURRENCY,
+        ttl: float = config.JOB_TTL_SECONDS,
+    ):
+        self.handler = handler
+        self.store = store or create_store()
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.owner = os.getpid()
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        # Pick up queued work and jobs left running by a process that is gone.
+        # Other processes sharing the store may queue the same jobs; only the
+        # one that claims a job runs it.
+        for job in self.store.unfinished():
+            if job.status == RUNNING and (_owner_alive(job.owner) or not self.store.requeue(job)):
+                continue
+            self._queue.put_nowait(job.id)
+        self._consumers = [
+            asyncio.create_task(self._consume()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self.store.close()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, file_url: str) -> tuple:
+        """Queue a job, or return the in-flight job for the same document.
+
+        Returns ``(job, deduplicated)``.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        existing = self.store.find_active(file_url)
+        if existing is not None:
+            return existing, True
+
+        self.store.prune(time.time() - self.ttl)
+        job = Job(id=uuid.uuid4().hex, key=file_url, file_url=file_url)
+        self.store.add(job)
+        self._queue.put_nowait(job.id)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def _consume(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.store.claim(job_id, self.owner)
+                if job is not None:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.started_at = time.time()
+        job.timings = {"queued": job.started_at - job.created_at}
+        self.store.save(job)
+
+        started = time.perf_counter()
+        try:
+            job.result = await self.handler(job.file_url, job.timings)
+            job.status = SUCCEEDED
+        except HTTPException as e:
+            job.status = FAILED
+            job.status_code = e.status_code
+            job.error = str(e.detail)
+        except Exception as e:
+            job.status = FAILED
+            job.status_code = 500
+            job.error = f"Failed to process PDF: {str(e)}"
+        job.timings["total"] = time.perf_counter() - started
+        job.finished_at = time.time()
+        self.store.save(job)
+
+
+def _owner_alive(pid: Optional[int]) -> bool:
+    # Before this process has claimed anything, its own pid can only be a
+    # previous run's, e.g. a restarted container
+    if pid is None or pid == os.getpid():
+        return False
+    if os.name == "nt":
+        # os.kill would terminate the process here rather than probe it
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,12 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import fitz  # PyMuPDF
-import requests
-from typing import List, Optional
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.datastructures import Headers, MutableHeaders
+from typing import Dict, List, Optional
+import asyncio
+import contextlib
+import json
+import time
+
+import config
+import metrics
+from cache import ExtractionCache
+from downloads import Downloader, DownloadError, DownloadTimeoutError, InvalidUrlError
+from estimates import CATEGORIES, InvalidCategoryError, line_items, price_matrix
+from extraction import EXTRACTOR_VERSION
+from jobs import JobQueue
+from models import EstimateMatrix, JobStatus, JobSubmitted, PitchDetail, RoofMeasurements
+from pdf_text import InvalidPdfError, extract_pdf_measurements
+from spool import PayloadTooLargeError, SpooledPdf, check_length, iter_upload, spool
+from workers import PoolSaturatedError, WorkerPool
 
 app = FastAPI()
 
+downloader = Downloader()
+pdf_pool = WorkerPool()
+extraction_cache = ExtractionCache(EXTRACTOR_VERSION)
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -14,148 +35,364 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-class PitchDetail(BaseModel):
-    pitch: str
-    area: float
-
-class RoofFacet(BaseModel):
-    number: int
-    area: float
-
-class RoofMeasurements(BaseModel):
-    total_area: float
-    predominant_pitch: str
-    ridges: float
-    hips: float
-    valleys: float
-    rakes: float
-    eaves: float
-    flashing: float
-    step_flashing: float
-    pitch_details: List[PitchDetail]
-    facets: List[RoofFacet]
-    suggested_waste_percentage: float
+metrics.Gauge("pdf_pool_in_flight", "PDF jobs running or queued in the worker pool.", lambda: pdf_pool.pending)
+metrics.Gauge("pdf_pool_waiting", "Batch and background PDF jobs waiting for a worker pool slot.", lambda: pdf_pool.waiting)
+metrics.Gauge("pdf_pool_capacity", "PDF jobs the worker pool accepts before rejecting.", lambda: pdf_pool.max_pending)
+metrics.Gauge("job_queue_depth", "Background jobs waiting for a consumer.", lambda: job_queue.depth)
+
+class ObserveRequests:
+    """Time every request by route, until the last byte of the body is sent.
+
+    A plain ASGI middleware rather than ``@app.middleware("http")``, whose
+    ``call_next`` returns once the headers are out, which made streamed
+    batches look instant. With an ``X-Profile: 1`` request header the
+    per-stage breakdown is also returned in a ``Server-Timing`` response
+    header; as headers precede the body, its ``total`` is the time to the
+    headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        profiling = Headers(scope=scope).get("x-profile", "").lower() in ("1", "true")
+        started = time.perf_counter()
+        response = {"status": 500, "elapsed": None}
+
+        async def observed_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if profiling:
+                    timings["total"] = time.perf_counter() - started
+                    MutableHeaders(scope=message).append("Server-Timing", metrics.server_timing(timings))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response["elapsed"] = time.perf_counter() - started
+
+        try:
+            with metrics.profile_stages(timings) if profiling else contextlib.nullcontext():
+                await self.app(scope, receive, observed_send)
+        finally:
+            # Failed or abandoned responses are timed until the app gave up
+            elapsed = response["elapsed"]
+            if elapsed is None:
+                elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.REQUEST_SECONDS.labels(scope["method"], route, response["status"]).observe(elapsed)
+
+app.add_middleware(ObserveRequests)
 
 class ProcessPdfRequest(BaseModel):
     file_url: str
 
-def extract_measurements(text: str) -> RoofMeasurements:
-    # Initialize measurements with default values
-    measurements = {
-        "total_area": 0.0,
-        "predominant_pitch": "",
-        "ridges": 0.0,
-        "hips": 0.0,
-        "valleys": 0.0,
-        "rakes": 0.0,
-        "eaves": 0.0,
-        "flashing": 0.0,
-        "step_flashing": 0.0,
-        "pitch_details": [],
-        "facets": [],
-        "suggested_waste_percentage": 10.0  # Default waste percentage
-    }
-    
-    # Extract total area
-    area_match = re.search(r"Total Area:\s*([\d,]+(?:\.\d+)?)", text)
-    if area_match:
-        measurements["total_area"] = float(area_match.group(1).replace(",", ""))
-    
-    # Extract predominant pitch
-    pitch_match = re.search(r"Predominant Pitch:\s*([\d/]+)", text)
-    if pitch_match:
-        measurements["predominant_pitch"] = pitch_match.group(1)
-    
-    # Extract length measurements
-    length_patterns = {
-        "ridges": r"Ridge Length:\s*([\d,]+(?:\.\d+)?)",
-        "hips": r"Hip Length:\s*([\d,]+(?:\.\d+)?)",
-        "valleys": r"Valley Length:\s*([\d,]+(?:\.\d+)?)",
-        "rakes": r"Rake Length:\s*([\d,]+(?:\.\d+)?)",
-        "eaves": r"Eave Length:\s*([\d,]+(?:\.\d+)?)",
-        "flashing": r"Flashing Length:\s*([\d,]+(?:\.\d+)?)",
-        "step_flashing": r"Step Flashing Length:\s*([\d,]+(?:\.\d+)?)"
-    }
-    
-    for key, pattern in length_patterns.items():
-        match = re.search(pattern, text)
-        if match:
-            measurements[key] = float(match.group(1).replace(",", ""))
-    
-    # Extract pitch details
-    pitch_area_pattern = r"([\d/]+)\s*pitch\s*area:\s*([\d,]+(?:\.\d+)?)"
-    pitch_matches = re.finditer(pitch_area_pattern, text, re.IGNORECASE)
-    for match in pitch_matches:
-        pitch = match.group(1)
-        area = float(match.group(2).replace(",", ""))
-        measurements["pitch_details"].append({
-            "pitch": pitch,
-            "area": area
-        })
-    
-    # Extract facet details
-    facet_pattern = r"Facet\s*(\d+)\s*area:\s*([\d,]+(?:\.\d+)?)"
-    facet_matches = re.finditer(facet_pattern, text, re.IGNORECASE)
-    for match in facet_matches:
-        number = int(match.group(1))
-        area = float(match.group(2).replace(",", ""))
-        measurements["facets"].append({
-            "number": number,
-            "area": area
-        })
-    
-    # Calculate suggested waste percentage based on complexity
-    total_length = sum([
-        measurements["ridges"],
-        measurements["hips"],
-        measurements["valleys"],
-        measurements["rakes"],
-        measurements["eaves"]
-    ])
-    
-    # Adjust waste percentage based on roof complexity
-    if total_length > 500:
-        measurements["suggested_waste_percentage"] = 15.0
-    elif total_length > 300:
-        measurements["suggested_waste_percentage"] = 12.5
-    else:
-        measurements["suggested_waste_percentage"] = 10.0
-    
-    return RoofMeasurements(**measurements)
+class ProcessPdfBatchRequest(BaseModel):
+    file_urls: List[str]
+
+class EstimateScenario(BaseModel):
+    # Indices into the request's option lists
+    category: int = 0
+    waste_percentage: int = 0
+    profit_margin: int = 0
+    pitch_breakdown: int = 0
+
+class EstimateMatrixRequest(BaseModel):
+    measurements: RoofMeasurements
+    categories: List[str] = CATEGORIES
+    # Defaults to the measurements' suggested waste percentage
+    waste_percentages: Optional[List[float]] = None
+    profit_margins: List[float] = [25.0]
+    # Alternative pitch breakdowns; defaults to the measured one
+    pitch_breakdowns: Optional[List[List[PitchDetail]]] = None
+    selected: EstimateScenario = EstimateScenario()
+
+@app.on_event("startup")
+async def startup():
+    downloader.start()
+    pdf_pool.start()
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_queue.stop()
+    await downloader.close()
+    await pdf_pool.shutdown()
+    extraction_cache.close()
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return extraction_cache.stats()
+
+def failure(cause: str, status_code: int, detail: str) -> HTTPException:
+    # Every failed document is counted by cause on its way to the client
+    metrics.FAILURES.labels(cause).inc()
+    return HTTPException(status_code=status_code, detail=detail)
+
+async def measure_pdf(pdf: SpooledPdf, wait: bool = False) -> RoofMeasurements:
+    cached = extraction_cache.get(pdf.sha256)
+    if cached is not None:
+        return RoofMeasurements(**cached)
+
+    try:
+        # Open the PDF and extract measurements page by page off the event loop
+        measurements, timings, pages = await pdf_pool.run(
+            extract_pdf_measurements, pdf.path, wait=wait
+        )
+    except PoolSaturatedError as e:
+        raise failure("pool_saturated", 503, str(e))
+    except InvalidPdfError as e:
+        raise failure("invalid_pdf", 422, str(e))
+    except Exception as e:
+        raise failure("processing", 500, f"Failed to process PDF: {str(e)}")
+
+    for name, seconds in timings.items():
+        metrics.record_stage(name, seconds)
+    metrics.DOCUMENT_BYTES.observe(pdf.size)
+    metrics.DOCUMENT_PAGES.observe(pages["pages"])
+    metrics.PAGES_READ.observe(pages["pages_read"])
+    extraction_cache.put(pdf.sha256, jsonable_encoder(measurements))
+    return measurements
+
+async def measure_url(url: str, wait: bool = False) -> RoofMeasurements:
+    # Fast path: this URL was processed moments ago
+    digest = extraction_cache.digest_for_url(url)
+    if digest is not None:
+        cached = extraction_cache.get(digest)
+        if cached is not None:
+            return RoofMeasurements(**cached)
+
+    try:
+        # Download the PDF file, or just revalidate it if this URL's ETag is known
+        with metrics.stage("download"):
+            download = await downloader.fetch(url, extraction_cache.etag_for_url(url))
+            if download.file is None:
+                cached = extraction_cache.get(download.sha256)
+                if cached is not None:
+                    extraction_cache.record_etag_hit()
+                    extraction_cache.remember_source(url, download.sha256, download.etag)
+                    return RoofMeasurements(**cached)
+                # The ETag pointed at an evicted entry, so fetch the body after all
+                download = await downloader.fetch(url)
+    except PayloadTooLargeError as e:
+        raise failure("too_large", 413, str(e))
+    except InvalidUrlError as e:
+        raise failure("invalid_url", 422, str(e))
+    except DownloadTimeoutError as e:
+        raise failure("download_timeout", 504, str(e))
+    except DownloadError as e:
+        raise failure("download", 502, f"Failed to download file: {str(e)}")
+
+    extraction_cache.remember_source(url, download.sha256, download.etag)
+    try:
+        return await measure_pdf(download.file, wait=wait)
+    finally:
+        download.file.remove()
+
 @app.post("/api/process-pdf")
 async def process_pdf(request: ProcessPdfRequest) -> RoofMeasurements:
+    return await measure_url(request.file_url)
+
+@app.post("/api/process-pdf/upload")
+async def process_pdf_upload(request: Request) -> RoofMeasurements:
+    """Process a PDF uploaded directly instead of fetched from a URL.
+
+    A raw ``application/pdf`` body is streamed straight to a temp file.
+    A multipart form with a ``file`` part is also accepted, although
+    Starlette buffers that part (in a spooled temp file) before we see it.
+    """
     try:
-        # Download the PDF file
-        response = requests.get(request.file_url)
-        response.raise_for_status()
-        pdf_data = response.content
-        
-        # Open the PDF with PyMuPDF
-        doc = fitz.open(stream=pdf_data, filetype="pdf")
-        
-        # Extract text from all pages
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        
-        # Close the document
-        doc.close()
-        
-        # Extract measurements from the text
-        measurements = extract_measurements(text)
-        return measurements
-        
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download file: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process PDF: {str(e)}")
+        check_length(request.headers.get("content-length"))
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=422, detail="Upload needs a 'file' part")
+            pdf = await spool(iter_upload(upload))
+        else:
+            pdf = await spool(request.stream())
+    except PayloadTooLargeError as e:
+        raise failure("too_large", 413, str(e))
+
+    try:
+        return await measure_pdf(pdf)
+    finally:
+        pdf.remove()
+
+@app.post("/api/process-pdf/batch")
+async def process_pdf_batch(request: Request):
+    """Process many PDFs at once, streaming one NDJSON line per document.
+
+    Accepts either a JSON body matching ProcessPdfBatchRequest or a
+    multipart form with one or more ``files`` parts. Lines are emitted in
+    completion order and carry the item's ``index`` in the request.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # Both limits apply before Starlette spools any part to disk
+        try:
+            check_length(
+                request.headers.get("content-length"),
+                config.MAX_PDF_BYTES * config.BATCH_MAX_ITEMS,
+                what="Batch",
+            )
+        except PayloadTooLargeError as e:
+            raise failure("too_large", 413, str(e))
+        form = await request.form(max_files=config.BATCH_MAX_ITEMS)
+        uploads = form.getlist("files")
+        if any(isinstance(upload, str) for upload in uploads):
+            raise HTTPException(status_code=422, detail="Batch 'files' parts must be file uploads")
+        sources = [upload.filename for upload in uploads]
+
+        async def measure_item(index: int) -> RoofMeasurements:
+            try:
+                pdf = await spool(iter_upload(uploads[index]))
+            except PayloadTooLargeError as e:
+                raise failure("too_large", 413, str(e))
+            try:
+                return await measure_pdf(pdf, wait=True)
+            finally:
+                pdf.remove()
+    else:
+        try:
+            batch = ProcessPdfBatchRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid batch request: {str(e)}")
+        sources = batch.file_urls
+
+        async def measure_item(index: int) -> RoofMeasurements:
+            return await measure_url(sources[index], wait=True)
+
+    if not sources:
+        raise HTTPException(status_code=422, detail="Batch request contains no files")
+    if len(sources) > config.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(sources)} files, limit is {config.BATCH_MAX_ITEMS}",
+        )
+
+    slots = asyncio.Semaphore(config.BATCH_CONCURRENCY)
+
+    async def run_item(index: int) -> dict:
+        # Per-item failures are reported in the stream, never raised
+        item = {"index": index, "source": sources[index]}
+        async with slots:
+            try:
+                measurements = await measure_item(index)
+                item.update(ok=True, result=jsonable_encoder(measurements))
+            except HTTPException as e:
+                item.update(ok=False, status=e.status_code, error=e.detail)
+            except Exception as e:
+                metrics.FAILURES.labels("unexpected").inc()
+                item.update(ok=False, status=500, error=f"Failed to process PDF: {str(e)}")
+        return item
+
+    async def stream_results():
+        tasks = [asyncio.create_task(run_item(i)) for i in range(len(sources))]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Stop outstanding work if the client disconnects mid-stream
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+async def run_job(file_url: str, timings: Dict[str, float]) -> dict:
+    with metrics.profile_stages(timings):
+        return jsonable_encoder(await measure_url(file_url, wait=True))
+
+job_queue = JobQueue(run_job)
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: ProcessPdfRequest) -> JobSubmitted:
+    """Queue a PDF for processing and return at once; poll /api/jobs/{id}."""
+    job, deduplicated = job_queue.submit(request.file_url)
+    return JobSubmitted(job_id=job.id, status=job.status, deduplicated=deduplicated)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str) -> JobStatus:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        file_url=job.file_url,
+        result=job.result,
+        error=job.error,
+        status_code=job.status_code,
+        timings=job.timings,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+@app.post("/api/estimates/matrix")
+async def estimate_matrix(request: EstimateMatrixRequest) -> EstimateMatrix:
+    """Price every requested option combination in one call."""
+    measurements = request.measurements
+    waste_percentages = request.waste_percentages
+    if waste_percentages is None:
+        waste_percentages = [measurements.suggested_waste_percentage]
+    pitch_breakdowns = request.pitch_breakdowns
+    if pitch_breakdowns is None:
+        pitch_breakdowns = [measurements.pitch_details]
+    options = {
+        "category": request.categories,
+        "waste_percentage": waste_percentages,
+        "profit_margin": request.profit_margins,
+        "pitch_breakdown": pitch_breakdowns,
+    }
+    for name, values in options.items():
+        if not values:
+            raise HTTPException(status_code=422, detail=f"No {name} options given")
+        index = getattr(request.selected, name)
+        if not 0 <= index < len(values):
+            raise HTTPException(status_code=422, detail=f"Selected {name} index {index} is out of range")
+
+    try:
+        prices = price_matrix(
+            measurements.total_area,
+            request.categories,
+            waste_percentages,
+            request.profit_margins,
+            pitch_breakdowns,
+        )
+    except InvalidCategoryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    selected = request.selected
+    return EstimateMatrix(
+        categories=request.categories,
+        waste_percentages=waste_percentages,
+        profit_margins=request.profit_margins,
+        material_costs=prices["material"].round(2).tolist(),
+        labor_costs=prices["labor"].round(2).tolist(),
+        totals=prices["totals"].round(2).tolist(),
+        selected=line_items(
+            measurements.total_area,
+            request.categories[selected.category],
+            waste_percentages[selected.waste_percentage],
+            request.profit_margins[selected.profit_margin],
+            pitch_breakdowns[selected.pitch_breakdown],
+        ),
+    )
 
 if __name__ == "__main__":
     import uvicorn
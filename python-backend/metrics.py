@@ -0,0 +1,201 @@
+import bisect
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(2 ** power for power in range(16, 27))  # 64 KiB .. 64 MiB
+PAGE_BUCKETS = (1, 2, 5, 10, 20, 40, 60, 100, 200)
+
+_REGISTRY: List["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        _REGISTRY.append(self)
+
+    def labels(self, *values: str):
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(child.value)}"
+
+
+class Gauge(Metric):
+    """A gauge read from a callback when metrics are scraped."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.read = read
+
+    def labels(self, *values: str):
+        raise ValueError(f"{self.name} is read from a callback and takes no labels")
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_number(self.read())}"
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = _labels(self.labelnames, key, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(child.sum)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in _REGISTRY) + "\n"
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status.",
+    ["method", "route", "status"],
+)
+STAGE_SECONDS = Histogram(
+    "pdf_stage_duration_seconds",
+    "Time spent in each PDF processing stage (download, open, text, extract).",
+    ["stage"],
+)
+DOCUMENT_BYTES = Histogram(
+    "pdf_document_bytes", "Size of processed PDFs in bytes.", buckets=SIZE_BUCKETS
+)
+DOCUMENT_PAGES = Histogram(
+    "pdf_document_pages", "Page count of processed PDFs.", buckets=PAGE_BUCKETS
+)
+PAGES_READ = Histogram(
+    "pdf_pages_read", "Pages whose text was extracted per PDF.", buckets=PAGE_BUCKETS
+)
+FAILURES = Counter(
+    "pdf_failures_total", "PDF processing failures by cause.", ["cause"]
+)
+
+# Stage timings for the current request or job, when profiling is on
+_profile: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_profile", default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    profile = _profile.get()
+    if profile is not None:
+        profile[stage] = profile.get(stage, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def profile_stages(timings: Dict[str, float]):
+    """Collect every stage recorded in this context into ``timings``."""
+    token = _profile.set(timings)
+    try:
+        yield timings
+    finally:
+        _profile.reset(token)
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    # Server-Timing header value, durations in milliseconds
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
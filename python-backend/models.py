@@ -0,0 +1,76 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class PitchDetail(BaseModel):
+    pitch: str
+    area: float
+
+class RoofFacet(BaseModel):
+    number: int
+    area: float
+
+class RoofMeasurements(BaseModel):
+    total_area: float
+    predominant_pitch: str
+    ridges: float
+    hips: float
+    valleys: float
+    rakes: float
+    eaves: float
+    flashing: float
+    step_flashing: float
+    pitch_details: List[PitchDetail]
+    facets: List[RoofFacet]
+    suggested_waste_percentage: float
+
+class MaterialItem(BaseModel):
+    name: str
+    base_price: float
+    unit: str
+    quantity: float
+    total: float
+
+class LaborItem(BaseModel):
+    pitch: str
+    rate: float
+    area: float
+    total: float
+
+class EstimateResult(BaseModel):
+    materials: List[MaterialItem]
+    labor: List[LaborItem]
+    profit_margin: float
+    total_material_cost: float
+    total_labor_cost: float
+    total_cost: float
+    total_price: float
+    category: str
+
+class EstimateMatrix(BaseModel):
+    categories: List[str]
+    waste_percentages: List[float]
+    profit_margins: List[float]
+    # material_costs[category][waste], labor_costs[pitch breakdown] and
+    # totals[category][waste][margin][pitch breakdown]
+    material_costs: List[List[float]]
+    labor_costs: List[float]
+    totals: List[List[List[List[float]]]]
+    selected: EstimateResult
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+    # True when the document was already queued or running under this job
+    deduplicated: bool
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    file_url: str
+    result: Optional[RoofMeasurements] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    timings: Dict[str, float]
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
@@ -0,0 +1,90 @@
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import fitz  # PyMuPDF
+
+from extraction import detect_vendor, extract_from_pages
+from models import RoofMeasurements
+
+class InvalidPdfError(ValueError):
+    pass
+
+
+# Outline entries whose titles point at the pages holding measurements
+TARGET_TITLES = ("summary", "pitch", "measurement", "area")
+
+
+def page_order(doc: "fitz.Document") -> List[int]:
+    """Page numbers to read, most promising first.
+
+    Pages the document outline names as summary or pitch-table pages come
+    first, each followed by the next page in case a table continues there;
+    the rest follow in reading order so nothing is lost when a report has
+    no outline.
+    """
+    targeted = []
+    for _, title, page in doc.get_toc(simple=True):
+        if 1 <= page <= doc.page_count and any(word in title.lower() for word in TARGET_TITLES):
+            targeted += [page - 1, page] if page < doc.page_count else [page - 1]
+    targeted = list(dict.fromkeys(targeted))
+
+    seen = set(targeted)
+    return targeted + [number for number in range(doc.page_count) if number not in seen]
+
+
+def page_text(doc: "fitz.Document", number: int, timings: Dict[str, float], pages: Dict[str, int]) -> str:
+    started = time.perf_counter()
+    text = doc.load_page(number).get_text()
+    timings["text"] += time.perf_counter() - started
+    pages["pages_read"] += 1
+    return text
+
+
+def iter_page_text(
+    doc: "fitz.Document",
+    order: List[int],
+    timings: Dict[str, float],
+    pages: Dict[str, int],
+    read: Dict[int, str],
+) -> Iterator[str]:
+    # Text is only extracted when the consumer asks for the next page;
+    # pages already in ``read`` are not extracted again
+    for number in order:
+        yield read[number] if number in read else page_text(doc, number, timings, pages)
+
+
+def extract_pdf_measurements(path: str) -> Tuple[RoofMeasurements, Dict[str, float], Dict[str, int]]:
+    """Open a spooled PDF and extract its measurements.
+
+    Also returns the seconds spent in each stage: ``open`` (parsing the
+    document), ``text`` (page text extraction) and ``extract`` (scanning
+    the text), the latter two being interleaved page by page; and the
+    document's page count alongside how many pages were actually read.
+    """
+    # Runs inside the worker pool, so keep it a plain top-level function.
+    # MuPDF reads the spooled file itself; no copy of it lives in Python.
+    timings = {"open": 0.0, "text": 0.0, "extract": 0.0}
+    started = time.perf_counter()
+    try:
+        doc = fitz.open(path, filetype="pdf")
+    except (RuntimeError, ValueError):
+        # MuPDF reports unreadable files as FileDataError, a RuntimeError;
+        # its message names our temp file, so it is not passed on
+        raise InvalidPdfError("File is not a readable PDF") from None
+    timings["open"] = time.perf_counter() - started
+    try:
+        pages = {"pages": doc.page_count, "pages_read": 0}
+        order = page_order(doc)
+        read = {}
+        vendor = None
+        if order and order[0] != 0:
+            # Branding is on the cover, which the outline may send to the back
+            read[0] = page_text(doc, 0, timings, pages)
+            vendor = detect_vendor(read[0])
+        # The extractor stops pulling pages once every field is found
+        started = time.perf_counter()
+        measurements = extract_from_pages(iter_page_text(doc, order, timings, pages, read), vendor=vendor)
+        timings["extract"] = time.perf_counter() - started - timings["text"]
+        return measurements, timings, pages
+    finally:
+        doc.close()
@@ -0,0 +1,61 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import config
+
+
+class PayloadTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class SpooledPdf:
+    """A PDF written to a temp file, hashed while it streamed in."""
+    path: str
+    sha256: str
+    size: int
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def check_length(length: Optional[str], max_bytes: int = config.MAX_PDF_BYTES, what: str = "File"):
+    # Reject early when the sender tells us the size up front
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise PayloadTooLargeError(f"{what} is {length} bytes, limit is {max_bytes}")
+
+
+async def spool(chunks: AsyncIterator[bytes], max_bytes: int = config.MAX_PDF_BYTES) -> SpooledPdf:
+    """Write a body to disk chunk by chunk without holding it in memory."""
+    hasher = hashlib.sha256()
+    size = 0
+    handle = tempfile.NamedTemporaryFile(
+        prefix="pdf-", suffix=".pdf", dir=config.SPOOL_DIR, delete=False
+    )
+    try:
+        with handle:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise PayloadTooLargeError(f"File exceeds limit of {max_bytes} bytes")
+                hasher.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return SpooledPdf(path=handle.name, sha256=hasher.hexdigest(), size=size)
+
+
+async def iter_upload(upload, chunk_size: int = config.SPOOL_CHUNK_BYTES) -> AsyncIterator[bytes]:
+    # Starlette's UploadFile is already spooled; re-read it in bounded chunks
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
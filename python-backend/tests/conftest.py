@@ -0,0 +1,13 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The backend runs as flat modules from python-backend/; the report
+# fixtures are shared with the benchmarks
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+# Worker threads rather than spawned processes keep the app tests quick;
+# config reads this when main is first imported
+os.environ.setdefault("PDF_WORKER_KIND", "thread")
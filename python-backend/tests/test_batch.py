@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import config
+import main
+import metrics
+from fixtures import make_report_pdf
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def pdf_parts(count: int):
+    pdf = make_report_pdf(1)
+    return [("files", (f"{i}.pdf", pdf, "application/pdf")) for i in range(count)]
+
+
+def test_multipart_batch_streams_one_line_per_file(client):
+    response = client.post("/api/process-pdf/batch", files=pdf_parts(3))
+    assert response.status_code == 200
+    items = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in items) == [0, 1, 2]
+    assert all(item["ok"] for item in items)
+
+
+@pytest.mark.parametrize("body", [[1, 2], "x", {"file_urls": "a"}, {}])
+def test_malformed_json_batch_is_rejected(client, body):
+    assert client.post("/api/process-pdf/batch", json=body).status_code == 422
+
+
+def test_text_parts_are_rejected(client):
+    response = client.post("/api/process-pdf/batch", files=[("files", (None, "text"))])
+    assert response.status_code == 422
+
+
+def test_batch_limits_apply_before_parsing(client, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/api/process-pdf/batch", files=pdf_parts(3))
+    assert response.status_code == 400
+
+    monkeypatch.setattr(config, "MAX_PDF_BYTES", 100)
+    response = client.post("/api/process-pdf/batch", files=pdf_parts(1))
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Batch is")
+
+
+def test_streamed_batch_is_timed_to_the_last_line(client, monkeypatch):
+    async def slow_measure_url(url, wait=False):
+        await asyncio.sleep(0.3)
+        raise main.failure("download", 502, "unreachable")
+
+    monkeypatch.setattr(main, "measure_url", slow_measure_url)
+    latency = metrics.REQUEST_SECONDS.labels("POST", "/api/process-pdf/batch", 200)
+    before = latency.sum
+
+    response = client.post("/api/process-pdf/batch", json={"file_urls": ["http://x/a.pdf"]})
+    assert response.status_code == 200
+    # The headers go out at once; the time counts until the line is sent
+    assert latency.sum - before >= 0.3
@@ -0,0 +1,111 @@
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from cache import ExtractionCache
+from fixtures import make_report_pdf
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ExtractionCache("1", max_entries=2, db_path="")
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    assert cache.get("c") == {"n": 3}
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ExtractionCache("1", ttl=10, db_path="")
+    cache.put("a", {"n": 1})
+    clock[0] += 10
+    assert cache.get("a") == {"n": 1}
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_tier_survives_restart_and_respects_version(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ExtractionCache("1", ttl=10, db_path=path)
+    cache.put("a", {"n": 1})
+    cache.close()
+
+    restarted = ExtractionCache("1", ttl=10, db_path=path)
+    assert restarted.get("a") == {"n": 1}
+    assert restarted.stats()["disk_hits"] == 1
+    # Promoted to memory, so the next lookup does not touch the disk
+    assert restarted.get("a") == {"n": 1}
+    assert restarted.stats()["memory_hits"] == 1
+    restarted.close()
+
+    assert ExtractionCache("2", ttl=10, db_path=path).get("a") is None
+    clock[0] += 11
+    assert ExtractionCache("1", ttl=10, db_path=path).get("a") is None
+
+
+def test_url_fast_path_expires(clock):
+    cache = ExtractionCache("1", url_ttl=5, db_path="")
+    cache.remember_source("http://x/a.pdf", "digest-a")
+    assert cache.digest_for_url("http://x/a.pdf") == "digest-a"
+    clock[0] += 6
+    assert cache.digest_for_url("http://x/a.pdf") is None
+    assert cache.stats()["url_hits"] == 1
+
+
+def test_etags_are_scoped_to_their_url():
+    cache = ExtractionCache("1", db_path="")
+    cache.remember_source("http://x/a.pdf", "digest-a", '"1"')
+    cache.remember_source("http://x/b.pdf", "digest-b", '"1"')
+    assert cache.etag_for_url("http://x/a.pdf") == ('"1"', "digest-a")
+    assert cache.etag_for_url("http://x/b.pdf") == ('"1"', "digest-b")
+    assert cache.etag_for_url("http://x/c.pdf") is None
+
+    # A later response without an ETag forgets the old one
+    cache.remember_source("http://x/a.pdf", "digest-a2")
+    assert cache.etag_for_url("http://x/a.pdf") is None
+
+
+def test_revalidation_never_crosses_urls(monkeypatch):
+    import main
+
+    files = {"/a.pdf": make_report_pdf(1, seed=1), "/b.pdf": make_report_pdf(1, seed=2)}
+    bodies_sent = []
+
+    def serve(request: httpx.Request) -> httpx.Response:
+        # Both files carry the same ETag, as per-object version counters do
+        if request.headers.get("if-none-match") == '"1"':
+            return httpx.Response(304, headers={"ETag": '"1"'})
+        bodies_sent.append(request.url.path)
+        return httpx.Response(200, headers={"ETag": '"1"'}, content=files[request.url.path])
+
+    monkeypatch.setattr(main.extraction_cache, "url_ttl", 0)
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(main.downloader, "_client", httpx.AsyncClient(transport=httpx.MockTransport(serve)))
+        hits_before = main.extraction_cache.stats()["etag_hits"]
+
+        def total_area(path: str) -> float:
+            response = client.post("/api/process-pdf", json={"file_url": "http://files.test" + path})
+            assert response.status_code == 200
+            return response.json()["total_area"]
+
+        first_a, first_b = total_area("/a.pdf"), total_area("/b.pdf")
+        assert first_a != first_b
+        assert bodies_sent == ["/a.pdf", "/b.pdf"]
+
+        # A 304 reuses the digest cached for that URL without a new body
+        assert total_area("/a.pdf") == first_a
+        assert total_area("/b.pdf") == first_b
+        assert bodies_sent == ["/a.pdf", "/b.pdf"]
+        assert main.extraction_cache.stats()["etag_hits"] == hits_before + 2
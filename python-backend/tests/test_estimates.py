@@ -0,0 +1,48 @@
+import itertools
+
+import pytest
+
+from estimates import CATEGORIES, InvalidCategoryError, line_items, price_matrix
+from models import PitchDetail
+
+
+def breakdown(*rows):
+    return [PitchDetail(pitch=pitch, area=area) for pitch, area in rows]
+
+
+def test_line_items_by_hand():
+    # 1000 sq ft of shingle with 10% waste and 20% margin; 13/12 has no
+    # labor rate and falls back to the 4/12 rate of 2.75
+    result = line_items(1000, "SHINGLE", 10, 20, breakdown(("6/12", 600), ("13/12", 400)))
+
+    # 1100 * 4.50 for shingles + 1000 * (0.45 + 0.30 + 0.25 + 0.15)
+    assert result.total_material_cost == pytest.approx(4950 + 1150)
+    assert [item.quantity for item in result.materials] == pytest.approx([1100, 1000, 1000, 1000, 1000])
+    # 600 * 3.25 + 400 * 2.75
+    assert [(item.pitch, item.rate) for item in result.labor] == [("6/12", 3.25), ("13/12", 2.75)]
+    assert result.total_labor_cost == pytest.approx(1950 + 1100)
+    assert result.total_cost == pytest.approx(9150)
+    assert result.total_price == pytest.approx(10980)
+
+
+def test_matrix_matches_line_items():
+    wastes = [0, 10, 12.5]
+    margins = [0, 20, 35]
+    breakdowns = [
+        breakdown(),
+        breakdown(("6/12", 1200.5)),
+        breakdown(("8/12", 700), ("2/12", 300), ("unknown", 200.25)),
+    ]
+    totals = price_matrix(1500.5, CATEGORIES, wastes, margins, breakdowns)["totals"]
+    assert totals.shape == (len(CATEGORIES), len(wastes), len(margins), len(breakdowns))
+
+    for (c, category), (w, waste), (m, margin), (p, rows) in itertools.product(
+        enumerate(CATEGORIES), enumerate(wastes), enumerate(margins), enumerate(breakdowns)
+    ):
+        expected = line_items(1500.5, category, waste, margin, rows).total_price
+        assert totals[c][w][m][p] == pytest.approx(expected)
+
+
+def test_unknown_category():
+    with pytest.raises(InvalidCategoryError, match="SLATE"):
+        price_matrix(1000, ["SHINGLE", "SLATE"], [10], [20], [breakdown()])
@@ -0,0 +1,86 @@
+import pytest
+
+from extraction import VENDORS, detect_vendor, extract_from_pages, extract_measurements
+from fixtures import FILLER, REPORT_FORMATS, expected_measurements, legacy_extract_measurements, report_text
+
+SEEDS = range(20)
+
+SUMMARY = (
+    "Total Area: 2000\nPredominant Pitch: 6/12\nRidge Length: 40\nHip Length: 10\n"
+    "Valley Length: 5\nRake Length: 60\nEave Length: 80\nFlashing Length: 8\n"
+    "Step Flashing Length: 12\n"
+)
+
+
+def extracted(text: str, vendor=None) -> dict:
+    measurements = extract_measurements(text, vendor).model_dump()
+    del measurements["suggested_waste_percentage"]
+    return measurements
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_generic_report_matches_legacy(seed):
+    text = report_text(seed)
+    assert extracted(text) == legacy_extract_measurements(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Rows keep counting after their areas add up to the total area
+        SUMMARY + "Facet 1 area: 2000\n6/12 pitch area: 1995\n12/12 pitch area: 5\n",
+        # Rows match in any case
+        "6/12 Pitch area: 600\n4/12 PITCH Area: 400\nFACET 2 AREA: 3\n",
+        "Total Area: 1,234.5\n" + FILLER * 40 + "\n8/12 pitch area: 1,234.5\n",
+        # Values any distance from their label or row keyword
+        "Total Area:" + " " * 300 + "1,234.5\n6/12" + " " * 100 + "pitch area:" + " " * 200 + "600\n",
+        # Labels match as printed, unlike rows
+        "TOTAL AREA: 5\nTotal Area: 6\nPredominant pitch: 4/12\n",
+    ],
+)
+def test_regressions_match_legacy(text):
+    assert extracted(text) == legacy_extract_measurements(text)
+
+
+@pytest.mark.parametrize("vendor", REPORT_FORMATS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_vendor_reports(vendor, seed):
+    text = report_text(seed, vendor)
+    assert detect_vendor(text) == vendor
+    assert extracted(text) == expected_measurements(seed, vendor)
+    assert extracted(text, vendor) == expected_measurements(seed, vendor)
+
+
+def test_flashing_is_not_read_from_step_flashing():
+    # The original scans picked up "Flashing Length" inside "Step Flashing Length"
+    measurements = extract_measurements("Step Flashing Length: 12\nFlashing Length: 30\n")
+    assert (measurements.step_flashing, measurements.flashing) == (12.0, 30.0)
+
+
+def test_vendor_names_are_registered():
+    assert set(REPORT_FORMATS) == set(VENDORS)
+
+
+@pytest.mark.parametrize("vendor", REPORT_FORMATS)
+def test_stops_one_page_after_the_tables(vendor):
+    pages_read = []
+
+    def pages():
+        for number, text in enumerate([report_text(1, vendor), FILLER, FILLER]):
+            pages_read.append(number)
+            yield text
+
+    measurements = extract_from_pages(pages())
+    # The page after the tables is read to check they do not continue
+    assert pages_read == [0, 1]
+    assert measurements.total_area == expected_measurements(1, vendor)["total_area"]
+
+
+@pytest.mark.parametrize("vendor", REPORT_FORMATS)
+def test_table_split_across_pages(vendor):
+    lines = report_text(1, vendor).splitlines(keepends=True)
+    # The last table's final row spills onto the next page
+    pages = ["".join(lines[:-1]), lines[-1], FILLER]
+    measurements = extract_from_pages(pages).model_dump()
+    del measurements["suggested_waste_percentage"]
+    assert measurements == expected_measurements(1, vendor)
@@ -0,0 +1,99 @@
+import asyncio
+import dataclasses
+import os
+import subprocess
+import sys
+
+import pytest
+
+from jobs import QUEUED, RUNNING, SUCCEEDED, Job, JobQueue, MemoryJobStore, SqliteJobStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    store = MemoryJobStore() if request.param == "memory" else SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture(scope="module")
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def queued_job(store, job_id: str = "a", status: str = QUEUED, owner=None) -> Job:
+    job = Job(id=job_id, key=f"http://x/{job_id}.pdf", file_url=f"http://x/{job_id}.pdf", status=status, owner=owner)
+    store.add(job)
+    return job
+
+
+def test_only_one_claim_wins(store):
+    queued_job(store)
+    assert store.claim("a", 1).owner == 1
+    assert store.claim("a", 2) is None
+    assert store.get("a").owner == 1
+
+
+def test_only_one_process_claims_from_a_shared_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = SqliteJobStore(path), SqliteJobStore(path)
+    queued_job(first)
+    assert first.claim("a", 1) is not None
+    assert second.claim("a", 2) is None
+    first.close()
+    second.close()
+
+
+def test_requeue_refuses_once_owner_changed(store):
+    queued_job(store)
+    stale = dataclasses.replace(store.claim("a", 1))
+    # Another process found the job orphaned and took it over
+    assert store.requeue(dataclasses.replace(stale))
+    assert store.claim("a", 2) is not None
+
+    assert not store.requeue(stale)
+    assert (store.get("a").status, store.get("a").owner) == (RUNNING, 2)
+
+
+def test_start_requeues_only_jobs_of_dead_owners(store, dead_pid):
+    queued_job(store, "queued")
+    queued_job(store, "alive", RUNNING, owner=os.getppid())
+    queued_job(store, "dead", RUNNING, owner=dead_pid)
+    queue = JobQueue(None, store, concurrency=0)
+    queue.start()
+
+    assert queue.depth == 2
+    assert (store.get("alive").status, store.get("alive").owner) == (RUNNING, os.getppid())
+    assert (store.get("dead").status, store.get("dead").owner) == (QUEUED, None)
+
+
+def test_submit_deduplicates_in_flight_urls(store):
+    queue = JobQueue(None, store, concurrency=0)
+    queue.start()
+    job, deduplicated = queue.submit("http://x/a.pdf")
+    assert not deduplicated
+    again, deduplicated = queue.submit("http://x/a.pdf")
+    assert deduplicated and again.id == job.id
+    assert not queue.submit("http://x/b.pdf")[1]
+    assert queue.depth == 2
+
+
+def test_jobs_run_to_completion(store):
+    async def handler(file_url, timings):
+        return {"file_url": file_url}
+
+    async def run():
+        queue = JobQueue(handler, store, concurrency=2)
+        queue.start()
+        job, _ = queue.submit("http://x/a.pdf")
+        await queue._queue.join()
+        return queue.get(job.id)
+
+    job = asyncio.run(run())
+    assert (job.status, job.result) == (SUCCEEDED, {"file_url": "http://x/a.pdf"})
+    # A finished job no longer absorbs new submissions
+    queue = JobQueue(handler, store, concurrency=0)
+    queue.start()
+    assert not queue.submit("http://x/a.pdf")[1]
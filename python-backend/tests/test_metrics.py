@@ -0,0 +1,47 @@
+import pytest
+
+import metrics
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    # Keep the test metrics out of the app's registry
+    monkeypatch.setattr(metrics, "_REGISTRY", [])
+
+
+def test_render():
+    latency = metrics.Histogram("test_seconds", "Test latency.", ["route"], buckets=(1, 0.1))
+    route = latency.labels('/a"b\\c\nd')
+    # A value equal to a bound falls in that bound's bucket
+    for value in (0.1, 1, 5):
+        route.observe(value)
+    metrics.Counter("test_total", "Test count.", ["cause"]).labels("x").inc(2)
+    metrics.Gauge("test_depth", "Test depth.", lambda: 2.5)
+
+    labels = 'route="/a\\"b\\\\c\\nd"'
+    assert metrics.render() == "\n".join([
+        "# HELP test_seconds Test latency.",
+        "# TYPE test_seconds histogram",
+        f'test_seconds_bucket{{{labels},le="0.1"}} 1',
+        f'test_seconds_bucket{{{labels},le="1"}} 2',
+        f'test_seconds_bucket{{{labels},le="+Inf"}} 3',
+        f"test_seconds_sum{{{labels}}} 6.1",
+        f"test_seconds_count{{{labels}}} 3",
+        "# HELP test_total Test count.",
+        "# TYPE test_total counter",
+        'test_total{cause="x"} 2',
+        "# HELP test_depth Test depth.",
+        "# TYPE test_depth gauge",
+        "test_depth 2.5",
+    ]) + "\n"
+
+
+def test_callback_gauge_takes_no_labels():
+    gauge = metrics.Gauge("test_depth", "Test depth.", lambda: 1)
+    with pytest.raises(ValueError):
+        gauge.labels("x")
+
+
+def test_label_count_is_checked():
+    with pytest.raises(ValueError):
+        metrics.Counter("test_total", "Test count.", ["cause"]).labels()
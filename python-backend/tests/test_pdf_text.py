@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+from fixtures import REPORT_FORMATS, expected_measurements, make_report_pdf
+from pdf_text import extract_pdf_measurements
+
+
+def extracted(tmp_path, data: bytes):
+    path = os.path.join(tmp_path, "report.pdf")
+    with open(path, "wb") as handle:
+        handle.write(data)
+    measurements, _, pages = extract_pdf_measurements(path)
+    measurements = measurements.model_dump()
+    del measurements["suggested_waste_percentage"]
+    return measurements, pages
+
+
+@pytest.mark.parametrize("vendor", REPORT_FORMATS)
+def test_outline_with_branding_on_cover(tmp_path, vendor):
+    # The outline sends the summary first, but only the cover names the vendor
+    data = make_report_pdf(8, seed=3, vendor=vendor, summary_page=5, outline=True, cover=True)
+    measurements, pages = extracted(tmp_path, data)
+    assert measurements == expected_measurements(3, vendor)
+    # The cover, the summary and the page after it
+    assert pages["pages_read"] == 3
+
+
+@pytest.mark.parametrize("vendor", REPORT_FORMATS)
+def test_report_without_outline(tmp_path, vendor):
+    data = make_report_pdf(6, seed=3, vendor=vendor, summary_page=2, cover=True)
+    measurements, pages = extracted(tmp_path, data)
+    assert measurements == expected_measurements(3, vendor)
+    # Read in order up to the page after the summary
+    assert pages["pages_read"] == 4
@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import config
+
+
+class PoolSaturatedError(Exception):
+    pass
+
+
+class WorkerPool:
+    """Bounded executor for CPU-bound PDF work.
+
+    At most ``max_pending`` jobs may be queued or running at once; further
+    submissions are rejected instead of piling up behind a slow document.
+    Callers that ``wait`` for a slot (batches, background jobs) can hold all
+    but ``reserved`` of them, so interactive requests are not starved.
+    """
+
+    def __init__(
+        self,
+        kind: str = config.PDF_WORKER_KIND,
+        max_workers: int = config.PDF_WORKERS,
+        max_pending: int = config.PDF_MAX_PENDING,
+        reserved: int = config.PDF_RESERVED_SLOTS,
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown worker kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.reserved = min(max(reserved, 0), self.max_pending - 1)
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting_slots: Optional[asyncio.Semaphore] = None
+        # Jobs holding a slot, and callers still waiting for one
+        self.pending = 0
+        self.waiting = 0
+
+    def start(self):
+        if self.kind == "process":
+            # Spawn rather than fork: the server process already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="pdf-worker"
+            )
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._waiting_slots = asyncio.Semaphore(self.max_pending - self.reserved)
+
+    async def shutdown(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            # Waiting for workers to exit blocks, so keep it off the event loop
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        if self._executor is None or self._slots is None:
+            raise RuntimeError("Worker pool has not been started")
+        if not wait and self._slots.locked():
+            raise PoolSaturatedError(
+                f"{self.pending} PDF jobs already in flight, try again shortly"
+            )
+
+        async with contextlib.AsyncExitStack() as slots:
+            self.waiting += 1
+            try:
+                if wait:
+                    await slots.enter_async_context(self._waiting_slots)
+                await slots.enter_async_context(self._slots)
+            finally:
+                self.waiting -= 1
+
+            self.pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, fn, *args)
+            finally:
+                self.pending -= 1